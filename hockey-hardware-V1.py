@@ -4,10 +4,21 @@ import sys
 import os
 import time
 import socket
+import logging
+import email.utils
+from datetime import datetime, timezone
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image, ImageDraw, ImageFont
 import RPi.GPIO as GPIO
 import spidev
+import numpy as np
+
+# orjson parses the scoreboard noticeably faster on the Pi; fall back to json
+try:
+    import orjson as json_lib
+except ImportError:
+    import json as json_lib
 
 # Ensure we're in the correct directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,6 +28,58 @@ sys.path.append(current_dir)
 import lcdconfig
 import LCD_1inch3
 
+logger = logging.getLogger(__name__)
+
+# Shared HTTP session so repeated polls reuse a kept-alive connection
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Hockey-hardware-V1"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+NCAA_URL = "https://ncaa-api.henrygd.me/scoreboard/football/fbs"
+
+# Last good response per url: url -> (fetched_at, etag, last_modified, data)
+_response_cache = {}
+# How long the last good scoreboard may stand in for failed fetches, in seconds
+MAX_CACHE_AGE = 10 * 60
+
+# Shown when the network is down
+TEST_DATA = {
+    "games": [{
+        "away_team": "Test Away",
+        "away_points": 21,
+        "home_team": "Test Home",
+        "home_points": 14,
+        "status": "FINAL"
+    }]
+}
+
+# Polling schedule, in seconds
+POLL_INTERVAL = 60
+RETRY_DELAY = 10
+MAX_RETRY_DELAY = 600
+
+# Score lines are drawn into fixed 20px rows so unchanged rows can be skipped
+WIDTH, HEIGHT = 240, 240
+ROW_X, ROW_TOP, ROW_HEIGHT = 10, 10, 20
+ROW_COUNT = 12
+
+# Font and blank backgrounds are built once and copied for each frame
+try:
+    FONT = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 15)
+except OSError:
+    FONT = ImageFont.load_default()
+SPACE_WIDTH = round(FONT.getlength(" "))
+BLANK = Image.new("RGB", (WIDTH, HEIGHT), "WHITE")
+BLANK_ROW = Image.new("RGB", (WIDTH, ROW_HEIGHT), "WHITE")
+
+# Pre-rendered text tiles keyed by text, so FreeType only runs on new strings
+GLYPH_CACHE = {}
+GLYPH_CACHE_MAX = 256
+
+# Last frame pushed to the panel
+_last_lines = None
+_last_rows = None
+
 def check_spi():
     """
     Check if SPI is enabled on the Raspberry Pi
@@ -43,40 +106,62 @@ def check_internet():
         test_socket.close()
         return True
     except OSError:
-        print("Warning: No internet connection detected")
+        logger.warning("No internet connection detected")
         return False
 
 def fetch_ncaa_scores():
     """
     Fetch NCAA football scores from the API
     """
-    if not check_internet():
-        print("No internet connection - using test data")
-        return {
-            "games": [{
-                "away_team": "Test Away",
-                "away_points": 21,
-                "home_team": "Test Home",
-                "home_points": 14,
-                "status": "FINAL"
-            }]
-        }
-
-    url = "https://ncaa-api.henrygd.me/scoreboard/football/fbs"
+    cached = _response_cache.get(NCAA_URL)
+
+    # Ask for a 304 if the scoreboard hasn't changed since the last fetch
+    headers = {}
+    if cached:
+        if cached[1]:
+            headers["If-None-Match"] = cached[1]
+        if cached[2]:
+            headers["If-Modified-Since"] = cached[2]
+
     try:
-        r = requests.get(url, timeout=5)
-        r.raise_for_status()
-        data = r.json()
+        with SESSION.get(NCAA_URL, timeout=5, headers=headers, stream=True) as r:
+            if r.status_code == 304 and cached:
+                _response_cache[NCAA_URL] = (time.monotonic(),) + cached[1:]
+                return cached[3]
+            r.raise_for_status()
+            # Collect the body in chunks rather than materializing r.content
+            buf = bytearray()
+            for chunk in r.iter_content(8192):
+                buf.extend(chunk)
+        data = json_lib.loads(buf)
+        _response_cache[NCAA_URL] = (time.monotonic(),
+                                     r.headers.get("ETag"),
+                                     r.headers.get("Last-Modified"),
+                                     data)
         
-        # Debug: Print the structure of the first game
-        print("\nAPI Response Structure:")
+        # Debug: Log the structure of the first game
         if 'games' in data and len(data['games']) > 0:
-            print("First game data structure:")
-            print(data['games'][0])
+            logger.debug("First game data structure: %s", data['games'][0])
         return data
-    except requests.RequestException as e:
-        print(f"Error fetching NCAA data: {e}")
-        return None
+    except (requests.RequestException, ValueError) as e:
+        logger.error("Error fetching NCAA data: %s", e)
+        raise
+
+def fallback_ncaa_scores():
+    """
+    Pick the data to show after a failed fetch
+    """
+    # Keep the last good scoreboard on screen through short outages only
+    cached = _response_cache.get(NCAA_URL)
+    if cached and time.monotonic() - cached[0] < MAX_CACHE_AGE:
+        logger.warning("Showing last fetched NCAA scores")
+        return cached[3]
+
+    # Only probe connectivity once a request has actually failed
+    if not check_internet():
+        logger.warning("No internet connection - using test data")
+        return TEST_DATA
+    return None
 
 def parse_ncaa_scores(data):
     """
@@ -84,92 +169,189 @@ def parse_ncaa_scores(data):
     """
     scores = []
     if not data or 'games' not in data:
-        print("No valid NCAA data found")
+        logger.warning("No valid NCAA data found")
         return scores
 
-    print(f"Found {len(data['games'])} games")
+    logger.debug("Found %d games", len(data['games']))
     for game in data['games']:
         try:
-            # Debug print for this specific game
-            print("\nProcessing game:")
-            print(game)
+            logger.debug("Processing game: %s", game)
             
             # Extract the team names and scores based on actual API structure
-            away_team = game.get('teams', {}).get('away', {}).get('name', 'Unknown')
-            home_team = game.get('teams', {}).get('home', {}).get('name', 'Unknown')
-            away_score = game.get('teams', {}).get('away', {}).get('score', 0)
-            home_score = game.get('teams', {}).get('home', {}).get('score', 0)
-            status = game.get('status', {}).get('type', 'Unknown')
-            
-            scores.append((away_team, away_score, home_team, home_score, status))
+            teams = game.get('teams', {})
+            away = teams.get('away', {})
+            home = teams.get('home', {})
+            scores.append((away.get('name', 'Unknown'), away.get('score', 0),
+                           home.get('name', 'Unknown'), home.get('score', 0),
+                           game.get('status', {}).get('type', 'Unknown')))
         except Exception as e:
-            print(f"Error parsing game data: {e}")
-            print(f"Problematic game data: {game}")
+            logger.error("Error parsing game data: %s", e)
+            logger.error("Problematic game data: %s", game)
             continue
     
     return scores
 
-def display_scores_on_lcd(scores):
+def get_glyph(text):
     """
-    Display scores on the LCD screen with enhanced error handling
+    Return a cached row-height tile with the text drawn black on white
+    """
+    tile = GLYPH_CACHE.get(text)
+    if tile is None:
+        if len(GLYPH_CACHE) >= GLYPH_CACHE_MAX:
+            GLYPH_CACHE.clear()
+        right = FONT.getbbox(text)[2]
+        tile = Image.new("RGB", (max(right, 1), ROW_HEIGHT), "WHITE")
+        ImageDraw.Draw(tile).text((0, 0), text, font=FONT, fill=(0, 0, 0))
+        GLYPH_CACHE[text] = tile
+    return tile
+
+def build_display_lines(scores):
+    """
+    Turn parsed scores into the (team, score) text pairs shown on each row
+    """
+    if not scores:
+        logger.debug("No scores to display")
+        return (("No games found.",),)
+
+    logger.debug("Displaying %d scores", len(scores))
+    lines = []
+    for (away_team, away_score, home_team, home_score, status) in scores:
+        lines.append((away_team[:10], str(away_score)))  # Truncate team names to fit
+        lines.append((home_team[:10], str(home_score)))
+    # Only whole games fit, so anything past the last row is dropped here
+    return tuple(lines[:ROW_COUNT])
+
+def render_rows(display_lines):
+    """
+    Render the display lines into fixed-height row tiles
+    """
+    rows = []
+    for parts in display_lines:
+        tile = BLANK_ROW.copy()
+        x = ROW_X
+        for text in parts:
+            glyph = get_glyph(text)
+            tile.paste(glyph, (x, 0))
+            x += glyph.width + SPACE_WIDTH
+        rows.append(tile)
+    # Pad with blank rows so lines left over from a longer frame get erased
+    while len(rows) < ROW_COUNT:
+        rows.append(BLANK_ROW)
+    return rows
+
+def to_rgb565(image):
     """
+    Pack an RGB image into the panel's big-endian RGB565 byte layout
+    """
+    arr = np.asarray(image)
+    rgb565 = (((arr[..., 0] & 0xF8).astype(np.uint16) << 8)
+              | ((arr[..., 1] & 0xFC).astype(np.uint16) << 3)
+              | (arr[..., 2] >> 3))
+    return rgb565.astype(">u2").tobytes()
+
+def show_window(display, image, y):
+    """
+    Push an image to the panel at row y, touching only that window
+    """
+    width, height = image.size
+    if y + height > HEIGHT:
+        # Clip to the panel like Image.paste does for the full frame
+        height = HEIGHT - y
+        image = image.crop((0, 0, width, height))
+    buf = to_rgb565(image)
+    display.SetWindows(0, y, width, y + height)
+    display.digital_write(display.DC_PIN, True)
+    # writebytes2 takes the buffer as-is and chunks it itself, unlike the
+    # driver's ShowImage which converts every pixel to a Python list first
+    display.SPI.writebytes2(buf)
+
+def init_display():
+    """
+    Initialize and clear the LCD once at startup
+    """
+    print("Initializing display...")
+    display = LCD_1inch3.LCD_1inch3()
+
+    print("Calling display.Init()...")
+    display.Init()
+
+    print("Clearing display...")
+    display.clear()
+    return display
+
+def display_scores_on_lcd(display, scores):
+    """
+    Display scores on the LCD screen, only pushing rows that changed
+    """
+    global _last_lines, _last_rows
+
+    display_lines = build_display_lines(scores)
+    if display_lines == _last_lines:
+        logger.debug("Scores unchanged, skipping display update")
+        return
+
     try:
-        print("Initializing display...")  # Debug print
-        
-        # Initialize display
-        display = LCD_1inch3.LCD_1inch3()
-        
-        print("Calling display.Init()...")  # Debug print
-        display.Init()
-        
-        print("Clearing display...")  # Debug print
-        display.clear()
+        rows = render_rows(display_lines)
+        row_bytes = [tile.tobytes() for tile in rows]
 
-        # Create a blank image
-        width, height = 240, 240
-        print(f"Creating image with dimensions {width}x{height}")  # Debug print
-        image = Image.new("RGB", (width, height), "WHITE")
-        draw = ImageDraw.Draw(image)
+        if _last_rows is None:
+            # Nothing known about the panel contents yet, send the whole frame
+            logger.debug("Creating image with dimensions %dx%d", WIDTH, HEIGHT)
+            image = BLANK.copy()
+            for i, tile in enumerate(rows):
+                image.paste(tile, (0, ROW_TOP + i * ROW_HEIGHT))
 
-        # Try to load font
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 15)
-            print("Loaded DejaVuSans font")  # Debug print
-        except OSError:
-            print("Using default font")  # Debug print
-            font = ImageFont.load_default()
-
-        # Draw scores
-        x, y = 10, 10
-        line_spacing = 20
-
-        if not scores:
-            print("No scores to display")  # Debug print
-            draw.text((x, y), "No games found.", font=font, fill=(0, 0, 0))
+            logger.debug("Showing image on display...")
+            show_window(display, image, 0)
+            time.sleep(2)
         else:
-            print(f"Displaying {len(scores)} scores")  # Debug print
-            for (away_team, away_score, home_team, home_score, status) in scores:
-                line = f"{away_team[:10]} {away_score}"  # Truncate team names to fit
-                draw.text((x, y), line, font=font, fill=(0, 0, 0))
-                y += line_spacing
-                line = f"{home_team[:10]} {home_score}"
-                draw.text((x, y), line, font=font, fill=(0, 0, 0))
-                y += line_spacing
-                if y > (height - line_spacing):
-                    break
-
-        print("Showing image on display...")  # Debug print
-        display.ShowImage(image)
-        time.sleep(2)
-        print("Display complete")  # Debug print
+            for i, tile in enumerate(rows):
+                if row_bytes[i] != _last_rows[i]:
+                    logger.debug("Updating row %d", i)
+                    show_window(display, tile, ROW_TOP + i * ROW_HEIGHT)
+
+        _last_lines = display_lines
+        _last_rows = row_bytes
+        logger.debug("Display complete")
 
     except Exception as e:
-        print(f"Error displaying scores: {e}")
-        print(f"Error type: {type(e)}")
-        print(f"Error args: {e.args}")
+        # Panel contents are unknown now, so redraw everything next time
+        _last_lines = None
+        _last_rows = None
+        logger.error("Error displaying scores: %s (%s, args=%s)", e, type(e), e.args)
         raise
 
+def retry_after(error):
+    """
+    Seconds a 429/503 response asked us to wait via Retry-After, or 0
+    """
+    response = getattr(error, "response", None)
+    if response is None or response.status_code not in (429, 503):
+        return 0
+    value = response.headers.get("Retry-After", "").strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0
+    if when.tzinfo is None:
+        return 0
+    return max(0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def wait_until(deadline):
+    """
+    Sleep until a time.monotonic() deadline in short steps so Ctrl+C stays responsive
+    """
+    remaining = deadline - time.monotonic()
+    while remaining > 0:
+        time.sleep(min(1.0, remaining))
+        remaining = deadline - time.monotonic()
+
 def main():
+    # Per-poll diagnostics are logged at DEBUG; switch the level to see them
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
     # Initialize GPIO first
     GPIO.setwarnings(False)
     GPIO.setmode(GPIO.BCM)
@@ -177,25 +359,47 @@ def main():
     if not check_spi():
         sys.exit(1)
 
+    display = init_display()
+
     print("Starting score display loop...")
+    retry_delay = RETRY_DELAY
+    fetch_delay = POLL_INTERVAL
     try:
         while True:
             try:
                 # Fetch and display scores
-                print("\nFetching NCAA scores...")
-                data = fetch_ncaa_scores()
+                logger.debug("Fetching NCAA scores...")
+                try:
+                    data = fetch_ncaa_scores()
+                    fetched = True
+                except (requests.RequestException, ValueError) as e:
+                    data = fallback_ncaa_scores()
+                    fetched = False
+                    server_delay = retry_after(e)
                 scores = parse_ncaa_scores(data)
-                display_scores_on_lcd(scores)
+                display_scores_on_lcd(display, scores)
+
+                if fetched:
+                    retry_delay = RETRY_DELAY
+                    fetch_delay = POLL_INTERVAL
+                    delay = POLL_INTERVAL
+                else:
+                    # Back off further on each consecutive failed fetch, never
+                    # polling the API faster than normal or sooner than it asked
+                    delay = max(fetch_delay, server_delay)
+                    fetch_delay = min(fetch_delay * 2, MAX_RETRY_DELAY)
                 
-                # Wait for 60 seconds before next update
-                print("Waiting 60 seconds before next update...")
-                time.sleep(60)
+                # Wait before next update
+                logger.debug("Waiting %d seconds before next update...", delay)
+                wait_until(time.monotonic() + delay)
                 
             except KeyboardInterrupt:
                 raise
             except Exception as e:
-                print(f"Error in update loop: {e}")
-                time.sleep(10)  # Wait a bit before retrying on error
+                # Back off further on each consecutive failure
+                logger.error("Error in update loop: %s; retrying in %d seconds", e, retry_delay)
+                wait_until(time.monotonic() + retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
                 
     except KeyboardInterrupt:
         print("\nProgram interrupted by user")